@@ -38,9 +38,8 @@ def test_imports():
         import flask
         import flask_socketio
         import azure.identity
-        import sounddevice
-        import numpy
-        import websocket
+        import aiohttp
+        import orjson
         print("✅ All required modules imported successfully!")
         return True
     except ImportError as e:
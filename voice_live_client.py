@@ -0,0 +1,196 @@
+"""
+Voice Live API networking: WebSocket connections and the client that opens them
+Kept free of audio device dependencies so the web server can import it alone
+"""
+import uuid
+import time
+import queue
+import asyncio
+import logging
+import threading
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+class VoiceLiveConnection:
+    def __init__(self, url: str, headers: dict) -> None:
+        self._url = url
+        self._headers = headers
+        self._ws = None
+        self._message_queue = queue.Queue()
+        self._connected = False
+
+    def connect(self) -> None:
+        # Only the console client uses this class; the web server needs aiohttp alone
+        import websocket
+
+        def on_message(ws, message):
+            self._message_queue.put(message)
+
+        def on_error(ws, error):
+            logger.error(f"WebSocket error: {error}")
+
+        def on_close(ws, close_status_code, close_msg):
+            logger.info("WebSocket connection closed")
+            self._connected = False
+            # Wake any reader blocked in recv()
+            self._message_queue.put(None)
+
+        def on_open(ws):
+            logger.info("WebSocket connection opened")
+            self._connected = True
+
+        self._ws = websocket.WebSocketApp(
+            self._url,
+            header=self._headers,
+            on_message=on_message,
+            on_error=on_error,
+            on_close=on_close,
+            on_open=on_open
+        )
+
+        # Start WebSocket in a separate thread
+        self._ws_thread = threading.Thread(target=self._ws.run_forever)
+        self._ws_thread.daemon = True
+        self._ws_thread.start()
+
+        # Wait for connection to be established
+        timeout = 10  # seconds
+        start_time = time.time()
+        while not self._connected and time.time() - start_time < timeout:
+            time.sleep(0.1)
+
+        if not self._connected:
+            raise ConnectionError("Failed to establish WebSocket connection")
+
+    def recv(self, timeout: float | None = None) -> str | None:
+        """Block until the next message arrives.
+
+        Returns None once the connection is closed, or if ``timeout`` seconds
+        pass without a message.
+        """
+        try:
+            return self._message_queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def send(self, message: str | bytes) -> None:
+        # bytes are sent as-is in a text frame (pre-serialized JSON)
+        if self._ws and self._connected:
+            self._ws.send(message)
+
+    def close(self) -> None:
+        if self._ws:
+            self._ws.close()
+            self._connected = False
+            self._message_queue.put(None)
+
+class AsyncVoiceLiveConnection:
+    """asyncio counterpart of VoiceLiveConnection.
+
+    Lets many sessions share one event loop (and one OS thread) instead of a
+    websocket-client thread per connection.
+    """
+
+    def __init__(self, url: str, headers: dict) -> None:
+        self._url = url
+        self._headers = headers
+        self._session = None
+        self._ws = None
+        # Serializes writers (audio uplink and response triggers run as separate
+        # tasks; a compressed frame can yield before its bytes are written)
+        self._send_lock = asyncio.Lock()
+
+    async def connect(self) -> None:
+        self._session = aiohttp.ClientSession()
+        try:
+            self._ws = await asyncio.wait_for(
+                self._session.ws_connect(self._url, headers=self._headers),
+                timeout=10,
+            )
+        except Exception as e:
+            await self._session.close()
+            raise ConnectionError(f"Failed to establish WebSocket connection: {e}") from e
+        logger.info("WebSocket connection opened")
+
+    async def recv(self) -> str | None:
+        """Wait for the next message; returns None once the connection is closed."""
+        msg = await self._ws.receive()
+        if msg.type in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
+            return msg.data
+        if msg.type == aiohttp.WSMsgType.ERROR:
+            logger.error(f"WebSocket error: {self._ws.exception()}")
+        logger.info("WebSocket connection closed")
+        return None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str:
+        message = await self.recv()
+        if message is None:
+            raise StopAsyncIteration
+        return message
+
+    async def send(self, message: str | bytes) -> None:
+        # bytes are pre-serialized JSON and go out as a text frame without a decode/re-encode
+        async with self._send_lock:
+            if self._ws is not None and not self._ws.closed:
+                if isinstance(message, bytes):
+                    await self._ws.send_frame(message, aiohttp.WSMsgType.TEXT)
+                else:
+                    await self._ws.send_str(message)
+
+    async def close(self) -> None:
+        if self._ws is not None:
+            await self._ws.close()
+        if self._session is not None:
+            await self._session.close()
+
+class AzureVoiceLive:
+    def __init__(
+        self,
+        *,
+        azure_endpoint: str | None = None,
+        api_version: str | None = None,
+        token: str | None = None,
+        api_key: str | None = None,
+    ) -> None:
+
+        self._azure_endpoint = azure_endpoint
+        self._api_version = api_version
+        self._token = token
+        self._api_key = api_key
+        self._connection = None
+
+    def connect(self, project_name: str, agent_id: str, agent_access_token: str) -> VoiceLiveConnection:
+        url, headers = self._prepare_connect(project_name, agent_id, agent_access_token)
+        self._connection = VoiceLiveConnection(url, headers)
+        self._connection.connect()
+        return self._connection
+
+    async def connect_async(self, project_name: str, agent_id: str, agent_access_token: str) -> AsyncVoiceLiveConnection:
+        url, headers = self._prepare_connect(project_name, agent_id, agent_access_token)
+        self._connection = AsyncVoiceLiveConnection(url, headers)
+        await self._connection.connect()
+        return self._connection
+
+    def _prepare_connect(self, project_name: str, agent_id: str, agent_access_token: str) -> tuple[str, dict]:
+        if self._connection is not None:
+            raise ValueError("Already connected to the Voice Live API.")
+        if not project_name:
+            raise ValueError("Project name is required.")
+        if not agent_id:
+            raise ValueError("Agent ID is required.")
+        if not agent_access_token:
+            raise ValueError("Agent access token is required.")
+
+        azure_ws_endpoint = self._azure_endpoint.rstrip('/').replace("https://", "wss://")
+
+        url = f"{azure_ws_endpoint}/voice-live/realtime?api-version={self._api_version}&agent-project-name={project_name}&agent-id={agent_id}&agent-access-token={agent_access_token}"
+
+        auth_header = {"Authorization": f"Bearer {self._token}"} if self._token else {"api-key": self._api_key}
+        request_id = uuid.uuid4()
+        headers = {"x-ms-client-request-id": str(request_id), **auth_header}
+        return url, headers
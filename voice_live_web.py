@@ -1,6 +1,5 @@
 #Speech example to test the Azure Voice Live API
 import os
-import uuid
 import json
 import time
 import base64
@@ -18,8 +17,7 @@ from azure.core.credentials import TokenCredential
 from azure.identity import DefaultAzureCredential
 from typing import Dict, Union, Literal, Set
 from typing_extensions import Iterator, TypedDict, Required
-import websocket
-from websocket import WebSocketApp
+from voice_live_client import AzureVoiceLive, VoiceLiveConnection
 from datetime import datetime
 
 from dotenv import load_dotenv
@@ -124,105 +122,6 @@ def main() -> None:
 logger = logging.getLogger(__name__)
 AUDIO_SAMPLE_RATE = 24000
 
-class VoiceLiveConnection:
-    def __init__(self, url: str, headers: dict) -> None:
-        self._url = url
-        self._headers = headers
-        self._ws = None
-        self._message_queue = queue.Queue()
-        self._connected = False
-
-    def connect(self) -> None:
-        def on_message(ws, message):
-            self._message_queue.put(message)
-
-        def on_error(ws, error):
-            logger.error(f"WebSocket error: {error}")
-
-        def on_close(ws, close_status_code, close_msg):
-            logger.info("WebSocket connection closed")
-            self._connected = False
-
-        def on_open(ws):
-            logger.info("WebSocket connection opened")
-            self._connected = True
-
-        self._ws = websocket.WebSocketApp(
-            self._url,
-            header=self._headers,
-            on_message=on_message,
-            on_error=on_error,
-            on_close=on_close,
-            on_open=on_open
-        )
-
-        # Start WebSocket in a separate thread
-        self._ws_thread = threading.Thread(target=self._ws.run_forever)
-        self._ws_thread.daemon = True
-        self._ws_thread.start()
-
-        # Wait for connection to be established
-        timeout = 10  # seconds
-        start_time = time.time()
-        while not self._connected and time.time() - start_time < timeout:
-            time.sleep(0.1)
-
-        if not self._connected:
-            raise ConnectionError("Failed to establish WebSocket connection")
-
-    def recv(self) -> str:
-        try:
-            return self._message_queue.get(timeout=1)
-        except queue.Empty:
-            return None
-
-    def send(self, message: str) -> None:
-        if self._ws and self._connected:
-            self._ws.send(message)
-
-    def close(self) -> None:
-        if self._ws:
-            self._ws.close()
-            self._connected = False
-
-class AzureVoiceLive:
-    def __init__(
-        self,
-        *,
-        azure_endpoint: str | None = None,
-        api_version: str | None = None,
-        token: str | None = None,
-        api_key: str | None = None,
-    ) -> None:
-
-        self._azure_endpoint = azure_endpoint
-        self._api_version = api_version
-        self._token = token
-        self._api_key = api_key
-        self._connection = None
-
-    def connect(self, project_name: str, agent_id: str, agent_access_token: str) -> VoiceLiveConnection:
-        if self._connection is not None:
-            raise ValueError("Already connected to the Voice Live API.")
-        if not project_name:
-            raise ValueError("Project name is required.")
-        if not agent_id:
-            raise ValueError("Agent ID is required.")
-        if not agent_access_token:
-            raise ValueError("Agent access token is required.")
-
-        azure_ws_endpoint = self._azure_endpoint.rstrip('/').replace("https://", "wss://")
-
-        url = f"{azure_ws_endpoint}/voice-live/realtime?api-version={self._api_version}&agent-project-name={project_name}&agent-id={agent_id}&agent-access-token={agent_access_token}"
-
-        auth_header = {"Authorization": f"Bearer {self._token}"} if self._token else {"api-key": self._api_key}
-        request_id = uuid.uuid4()
-        headers = {"x-ms-client-request-id": str(request_id), **auth_header}
-
-        self._connection = VoiceLiveConnection(url, headers)
-        self._connection.connect()
-        return self._connection
-
 class AudioPlayerAsync:
     def __init__(self):
         self.queue = deque()
@@ -306,7 +205,7 @@ def receive_audio_and_playback(connection: VoiceLiveConnection) -> None:
     logger.info("Starting audio playback ...")
     try:
         while not stop_event.is_set():
-            raw_event = connection.recv()
+            raw_event = connection.recv(timeout=1)
             if raw_event is None:
                 continue
 
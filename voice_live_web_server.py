@@ -4,40 +4,70 @@ Adapts the existing voice_live_web.py functionality for web browser use
 """
 
 import os
-import uuid
 import json
 import time
 import base64
 import logging
+import functools
 import threading
-import numpy as np
-import queue
-import asyncio
 try:
-    import websocket as ws_client
+    import orjson
 except ImportError:
-    print("websocket-client package not installed. Please run: pip install websocket-client")
-    ws_client = None
-from datetime import datetime
+    print("orjson package not installed. Please run: pip install orjson")
+    orjson = None
+import asyncio
 from collections import deque
+from dataclasses import dataclass
 
 from flask import Flask, render_template, request
 from flask_socketio import SocketIO, emit
 from dotenv import load_dotenv
 from azure.identity import DefaultAzureCredential
 
-# Import the existing classes from voice_live_web.py
+# Import the networking classes only; voice_live_web.py pulls in numpy and
+# sounddevice for local playback, which the browser handles here
 import sys
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from voice_live_web import AzureVoiceLive, VoiceLiveConnection, AudioPlayerAsync
+try:
+    from voice_live_client import AzureVoiceLive
+except ImportError as e:
+    # voice_live_client needs aiohttp
+    print(f"voice_live_client could not be imported ({e}). Please run: pip install aiohttp")
+    AzureVoiceLive = None
 
 load_dotenv()
 
+@dataclass(frozen=True)
+class Cfg:
+    """Voice Live settings read once from the environment at startup"""
+    endpoint: str
+    agent_id: str
+    project_name: str
+    api_version: str
+    agg_target_ms: int
+    agg_max_wait_ms: int
+    assumed_sample_rate: int
+
+CFG = Cfg(
+    endpoint=os.environ["AZURE_VOICE_LIVE_ENDPOINT"],
+    agent_id=os.environ["AI_FOUNDRY_AGENT_ID"],
+    project_name=os.environ["AI_FOUNDRY_PROJECT_NAME"],
+    api_version=os.environ.get("AZURE_VOICE_LIVE_API_VERSION", "2025-05-01-preview"),
+    agg_target_ms=int(os.environ.get("VOICE_AGG_TARGET_MS", "140")),
+    agg_max_wait_ms=int(os.environ.get("VOICE_AGG_MAX_WAIT_MS", "80")),
+    assumed_sample_rate=int(os.environ.get("VOICE_ASSUMED_SAMPLE_RATE", "24000")),
+)
+
 # Initialize Flask app
 try:
     app = Flask(__name__)
     app.config['SECRET_KEY'] = 'your-secret-key'
-    socketio = SocketIO(app, cors_allowed_origins="*")
+    # Azure I/O lives on the shared asyncio loop thread, so Socket.IO stays in
+    # plain threading mode (eventlet/gevent monkey patching would break that
+    # loop). Handlers only hand work off to the loop, so they run inline on
+    # the client's connection thread rather than on a new thread per event
+    # (audio_data alone arrives about 10 times a second per client).
+    socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading', async_handlers=False)
     logger = logging.getLogger(__name__)
 except Exception as e:
     print(f"Error initializing Flask app: {e}")
@@ -45,7 +75,134 @@ except Exception as e:
     exit(1)
 
 # Global variables for managing connections
-active_connections = {}
+# Socket.IO handlers run concurrently, so registry mutations go through _conn_lock
+active_connections: dict[str, "WebVoiceLiveSession"] = {}
+_conn_lock = threading.Lock()
+
+def _log_task_exception(task) -> None:
+    """Done-callback for background work on the Azure loop; fire-and-forget would drop its errors"""
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Background task failed", exc_info=task.exception())
+
+def _unregister_session(session_id: str, voice_session) -> None:
+    """Drop voice_session from the registry if it is still the one registered for session_id"""
+    with _conn_lock:
+        if active_connections.get(session_id) is voice_session:
+            del active_connections[session_id]
+
+def _remove_session(session_id: str) -> bool:
+    """Unregister and stop a client's session; returns False if it had none"""
+    with _conn_lock:
+        voice_session = active_connections.pop(session_id, None)
+    if voice_session is None:
+        return False
+    voice_session.stop_session()
+    return True
+
+# Shared AAD credential and token cache (DefaultAzureCredential probes several
+# auth sources on construction, and tokens stay valid for about an hour)
+AAD_SCOPES = "https://ai.azure.com/.default"
+_CREDENTIAL = DefaultAzureCredential()
+_TOKEN_CACHE = {'token': None, 'expires_on': 0}
+_TOKEN_LOCK = threading.Lock()
+
+def _get_token():
+    """Return a cached AAD access token, refreshing it shortly before expiry"""
+    if time.time() < _TOKEN_CACHE['expires_on'] - 60:
+        return _TOKEN_CACHE['token']
+    with _TOKEN_LOCK:
+        # Another session may have refreshed while we waited for the lock
+        if time.time() >= _TOKEN_CACHE['expires_on'] - 60:
+            token = _CREDENTIAL.get_token(AAD_SCOPES)
+            _TOKEN_CACHE['token'] = token.token
+            _TOKEN_CACHE['expires_on'] = token.expires_on
+        return _TOKEN_CACHE['token']
+
+# One asyncio loop, on its own thread, multiplexes every session's Azure
+# WebSocket; Socket.IO handlers hand work to it with the *_threadsafe APIs.
+# The platform default loop is already readiness based (epoll/kqueue selector,
+# IOCP proactor on Windows).
+_AZURE_LOOP = asyncio.new_event_loop()
+threading.Thread(target=_AZURE_LOOP.run_forever, name="azure-voice-live", daemon=True).start()
+
+# Server VAD timing, shared with the page's client-side silence gate so the
+# uplink keeps streaming trailing silence until the server can close the turn
+VAD_PREFIX_PADDING_MS = 200
+VAD_SILENCE_DURATION_MS = 200
+VAD_END_OF_UTTERANCE_TIMEOUT_S = 2
+# Silence still uploaded after the last loud frame: the longest the server VAD
+# may wait before speech_stopped, plus one silence window of margin
+SPEECH_HANGOVER_MS = max(VAD_SILENCE_DURATION_MS, VAD_END_OF_UTTERANCE_TIMEOUT_S * 1000) + VAD_SILENCE_DURATION_MS
+
+# Static Voice Live events, serialized once at import instead of per session/frame
+# (stdlib json here, so a missing orjson is still reported by check_dependencies)
+SESSION_UPDATE = {
+    "type": "session.update",
+    "session": {
+        "turn_detection": {
+            "type": "azure_semantic_vad",
+            "threshold": 0.3,
+            "prefix_padding_ms": VAD_PREFIX_PADDING_MS,
+            "silence_duration_ms": VAD_SILENCE_DURATION_MS,
+            "remove_filler_words": False,
+            # Responses are requested by the session's FIFO response gate
+            "create_response": False,
+            "end_of_utterance_detection": {
+                "model": "semantic_detection_v1",
+                "threshold": 0.01,
+                "timeout": VAD_END_OF_UTTERANCE_TIMEOUT_S,
+            },
+        },
+        # Browser capture worklet downsamples the microphone to 16 kHz PCM16
+        "input_audio_sampling_rate": 16000,
+        "input_audio_noise_reduction": {
+            "type": "azure_deep_noise_suppression"
+        },
+        "input_audio_echo_cancellation": {
+            "type": "server_echo_cancellation"
+        },
+        "voice": {
+            "name": "en-US-Ava:DragonHDLatestNeural",
+            "type": "azure-standard",
+            "temperature": 0.8,
+        },
+    },
+    "event_id": ""
+}
+
+# Fixed event_id so an error event can be matched to a rejected response.create
+RESPONSE_CREATE_EVENT_ID = "gate_response_create"
+RESPONSE_CREATE = {
+    "type": "response.create",
+    "response": {
+        "modalities": ["text", "audio"],
+        "instructions": "Please respond to the user's input."
+    },
+    "event_id": RESPONSE_CREATE_EVENT_ID
+}
+
+# Closes a turn the server VAD has not committed yet (mic stopped mid-speech)
+INPUT_AUDIO_COMMIT = {"type": "input_audio_buffer.commit"}
+
+_SESSION_UPDATE_BYTES = json.dumps(SESSION_UPDATE, separators=(',', ':')).encode()
+_RESPONSE_CREATE_BYTES = json.dumps(RESPONSE_CREATE, separators=(',', ':')).encode()
+_INPUT_AUDIO_COMMIT_BYTES = json.dumps(INPUT_AUDIO_COMMIT, separators=(',', ':')).encode()
+
+# input_audio_buffer.append envelope; the base64 payload is spliced in between
+_APPEND_PREFIX = b'{"type":"input_audio_buffer.append","audio":"'
+_APPEND_SUFFIX = b'","event_id":""}'
+
+# Socket.IO BINARY_EVENT header for audio_chunk on the default namespace with
+# one attachment; the raw PCM follows as a separate binary Engine.IO message
+# (Engine.IO adds its own MESSAGE type prefix on send)
+_AUDIO_CHUNK_HEADER = '51-["audio_chunk",{"_placeholder":true,"num":0}]'
+
+# Max client audio frames buffered per session before the oldest is dropped
+UPLINK_QUEUE_SIZE = 64
+# Max queued frames coalesced into one append event
+UPLINK_MAX_BATCH = 8
+# Uplink queue marker: commit the input buffer once the frames ahead of it are sent
+_UPLINK_COMMIT = object()
 
 class WebVoiceLiveSession:
     """Manages a Voice Live session for web clients"""
@@ -54,168 +211,212 @@ class WebVoiceLiveSession:
         """Initialize state for a single web client session."""
         self.session_id = session_id
         self.connection = None
-        self.audio_player = AudioPlayerAsync()
         self.is_active = False
-        self.response_in_progress = False
+        self._stop_requested = False  # set by stop_session before is_active is cleared
+        self._stopped = False
+        self._tasks = []
+
+        # Emit bound to this client's sid, built once for the hot receive path
+        self._emit = functools.partial(socketio.emit, to=session_id)
+
+        # Engine.IO sid of this client, resolved on the first audio chunk
+        self._eio_sid = None
+
+        # Voice Live event type -> handler; audio deltas are by far the most frequent
+        self._handlers = {
+            "response.audio.delta": self._on_audio_delta,
+            "session.created": self._on_session_created,
+            "conversation.item.input_audio_transcription.completed": self._on_input_transcript,
+            "response.text.done": self._on_text_done,
+            "response.audio_transcript.done": self._on_audio_transcript_done,
+            "response.audio.done": self._on_audio_done,
+            "response.done": self._on_response_done,
+            "response.created": self._on_response_created,
+            "input_audio_buffer.speech_started": self._on_speech_started,
+            "input_audio_buffer.speech_stopped": self._on_speech_stopped,
+            "error": self._on_error,
+        }
+
+        # Client audio is handed off to an uplink task on the Azure loop so a
+        # slow Azure send never stalls the Socket.IO handler
+        self._uplink_q = asyncio.Queue(maxsize=UPLINK_QUEUE_SIZE)
+
+        # FIFO of utterance boundaries (speech_stopped / client trigger). The
+        # response gate only sends response.create while no response is
+        # streaming, so back-to-back turns never cancel one in flight.
+        # Touched only on the Azure loop.
+        self._utterance_q = deque()
+        self._utterance_pending = asyncio.Event()
+        self._decoder_idle = asyncio.Event()
+        self._decoder_idle.set()
+        self._awaiting_created = False  # response.create sent, response.created not yet seen
+        self._speech_open = False       # speech_started seen without a matching speech_stopped
 
         # Audio delta aggregation for smoother client playback
-        self._audio_delta_accum = []      # base64 delta fragments
+        self._audio_delta_accum = []      # decoded PCM16 delta fragments
         self._audio_accum_bytes = 0       # accumulated decoded bytes
         self._audio_first_delta_time = None
 
         # Tunable aggregation parameters (can be adjusted for latency vs smoothness)
-        self.AGG_TARGET_MS = int(os.getenv("VOICE_AGG_TARGET_MS", "140"))  # desired buffered ms before emit
-        self.AGG_MAX_WAIT_MS = int(os.getenv("VOICE_AGG_MAX_WAIT_MS", "80"))  # max wait after first small chunk
+        self.AGG_TARGET_MS = CFG.agg_target_ms  # desired buffered ms before emit
+        self.AGG_MAX_WAIT_MS = CFG.agg_max_wait_ms  # max wait after first small chunk
         self.AGG_MAX_BYTES = (24000 // 1000) * 2 * 200  # up to ~200ms @24kHz 16-bit mono
-        self._assumed_sample_rate = int(os.getenv("VOICE_ASSUMED_SAMPLE_RATE", "24000"))
+        self._assumed_sample_rate = CFG.assumed_sample_rate
         
     def start_session(self):
-        """Initialize Voice Live API connection"""
-        if ws_client is None:
-            raise ImportError("websocket-client package not installed. Please run: pip install websocket-client")
-            
+        """Schedule the Voice Live session on the shared Azure loop"""
+        future = asyncio.run_coroutine_threadsafe(self._run_session(), _AZURE_LOOP)
+        future.add_done_callback(_log_task_exception)
+
+    async def _run_session(self):
+        """Connect to Voice Live API, then forward events until the connection closes"""
         try:
-            # Get credentials
-            endpoint = os.environ.get("AZURE_VOICE_LIVE_ENDPOINT")
-            agent_id = os.environ.get("AI_FOUNDRY_AGENT_ID")
-            project_name = os.environ.get("AI_FOUNDRY_PROJECT_NAME")
-            api_version = os.environ.get("AZURE_VOICE_LIVE_API_VERSION", "2025-05-01-preview")
-            
-            credential = DefaultAzureCredential()
-            scopes = "https://ai.azure.com/.default"
-            token = credential.get_token(scopes)
+            # Get credentials (token refresh is blocking I/O, keep it off the loop)
+            token = await _AZURE_LOOP.run_in_executor(None, _get_token)
             
             # Create client and connection
             client = AzureVoiceLive(
-                azure_endpoint=endpoint,
-                api_version=api_version,
-                token=token.token,
+                azure_endpoint=CFG.endpoint,
+                api_version=CFG.api_version,
+                token=token,
             )
             
-            self.connection = client.connect(
-                project_name=project_name,
-                agent_id=agent_id,
-                agent_access_token=token.token
+            self.connection = await client.connect_async(
+                project_name=CFG.project_name,
+                agent_id=CFG.agent_id,
+                agent_access_token=token
             )
             
             # Configure session for real-time voice
-            session_update = {
-                "type": "session.update",
-                "session": {
-                    "turn_detection": {
-                        "type": "azure_semantic_vad",
-                        "threshold": 0.3,
-                        "prefix_padding_ms": 200,
-                        "silence_duration_ms": 200,
-                        "remove_filler_words": False,
-                        "end_of_utterance_detection": {
-                            "model": "semantic_detection_v1",
-                            "threshold": 0.01,
-                            "timeout": 2,
-                        },
-                    },
-                    "input_audio_noise_reduction": {
-                        "type": "azure_deep_noise_suppression"
-                    },
-                    "input_audio_echo_cancellation": {
-                        "type": "server_echo_cancellation"
-                    },
-                    "voice": {
-                        "name": "en-US-Ava:DragonHDLatestNeural",
-                        "type": "azure-standard",
-                        "temperature": 0.8,
-                    },
-                },
-                "event_id": ""
-            }
-            
-            self.connection.send(json.dumps(session_update))
+            await self.connection.send(_SESSION_UPDATE_BYTES)
+            if self._stopped:
+                # Client went away while we were connecting
+                await self.connection.close()
+                return
             self.is_active = True
             
-            # Start listening for responses
-            threading.Thread(target=self._listen_for_responses, daemon=True).start()
+            # Start forwarding client audio and gating response triggers
+            # (keep references: the loop only holds weak ones to its tasks)
+            self._tasks = [
+                _AZURE_LOOP.create_task(self._uplink_loop()),
+                _AZURE_LOOP.create_task(self._response_gate()),
+            ]
+            for task in self._tasks:
+                task.add_done_callback(_log_task_exception)
             
-            socketio.emit('session_started', {'status': 'success'}, room=self.session_id)
+            self._emit('session_started', {'status': 'success'})
             print(f"Session {self.session_id} started successfully")
             
         except Exception as e:
             print(f"Error starting session {self.session_id}: {e}")
-            socketio.emit('session_error', {'error': str(e)}, room=self.session_id)
+            self._end_session(str(e))
+            return
+
+        await self._listen_for_responses()
+        if not self._stop_requested and not self._stopped:
+            # Azure closed the socket (token expiry, server error): tear down
+            # and let the client start a fresh session
+            self._end_session("Voice Live connection closed")
+
+    def _end_session(self, error: str):
+        """Shut down after a failure on the Azure side and notify the client"""
+        self._shutdown()
+        _unregister_session(self.session_id, self)
+        self._emit('session_error', {'error': error})
     
-    def _listen_for_responses(self):
+    async def _listen_for_responses(self):
         """Listen for responses from Voice Live API"""
-        while self.is_active and self.connection:
+        try:
+            async for raw_event in self.connection:
+                if not self.is_active:
+                    break
+                try:
+                    event = orjson.loads(raw_event)
+                    handler = self._handlers.get(event.get("type"))
+                    if handler:
+                        handler(event)
+                except Exception as e:
+                    logger.error("Error in response listener: %s", e)
+        except Exception as e:
+            logger.error("Response listener stopped: %s", e)
+
+    def _on_audio_delta(self, event):
+        # Send audio data back to client for playback as raw PCM
+        audio_data = event.get("delta", "")
+        if audio_data:
             try:
-                raw_event = self.connection.recv()
-                if raw_event is None:
-                    time.sleep(0.01)
-                    continue
-                
-                event = json.loads(raw_event)
-                event_type = event.get("type")
-                
-                # Handle different event types
-                if event_type == "session.created":
-                    session = event.get("session")
-                    print(f"Session created: {session.get('id')}")
-                    
-                elif event_type == "conversation.item.input_audio_transcription.completed":
-                    transcript = event.get("transcript", "")
-                    socketio.emit('transcript', {'text': transcript}, room=self.session_id)
-                    
-                elif event_type == "response.text.done":
-                    agent_text = event.get("text", "")
-                    socketio.emit('agent_text', {'text': agent_text}, room=self.session_id)
-                    
-                elif event_type == "response.audio_transcript.done":
-                    agent_audio_text = event.get("transcript", "")
-                    socketio.emit('agent_audio_transcript', {'text': agent_audio_text}, room=self.session_id)
-                    
-                elif event_type == "response.audio.delta":
-                    # Send audio data back to client for playback
-                    audio_data = event.get("delta", "")
-                    if audio_data:
-                        try:
-                            self._accumulate_or_emit_delta(audio_data)
-                        except Exception as agg_err:
-                            print(f"Aggregation error, falling back direct emit: {agg_err}")
-                            socketio.emit('audio_chunk', {'audio': audio_data}, room=self.session_id)
-                    else:
-                        print("Received empty audio delta")
-                        
-                elif event_type == "response.audio.done":
-                    print("Audio response completed")
-                    # Flush any remaining aggregated audio
-                    self._flush_audio_accum(force=True)
-                    socketio.emit('response_audio_done', {}, room=self.session_id)
-                    
-                elif event_type == "response.done":
-                    print("Full response completed")
-                    self.response_in_progress = False
-                    # Safety flush
-                    self._flush_audio_accum(force=True)
-                    socketio.emit('response_complete', {}, room=self.session_id)
-                
-                elif event_type == "response.created":
-                    print("Response generation started")
-                    self.response_in_progress = True
-                    socketio.emit('response_started', {}, room=self.session_id)
-                        
-                elif event_type == "input_audio_buffer.speech_started":
-                    socketio.emit('speech_started', {}, room=self.session_id)
-                    
-                elif event_type == "input_audio_buffer.speech_stopped":
-                    socketio.emit('speech_stopped', {}, room=self.session_id)
-                    
-                elif event_type == "error":
-                    error_details = event.get("error", {})
-                    socketio.emit('api_error', {'error': error_details}, room=self.session_id)
-                    
+                pcm = base64.b64decode(audio_data)
             except Exception as e:
-                print(f"Error in response listener: {e}")
-                time.sleep(0.1)
+                logger.warning("Dropping undecodable audio delta: %s", e)
+                return
+            self._accumulate_or_emit_delta(pcm)
+        else:
+            logger.debug("Received empty audio delta")
+
+    def _on_session_created(self, event):
+        session = event.get("session")
+        logger.info("Session created: %s", session.get('id'))
+
+    def _on_input_transcript(self, event):
+        self._emit('transcript', {'text': event.get("transcript", "")})
+
+    def _on_text_done(self, event):
+        self._emit('agent_text', {'text': event.get("text", "")})
+
+    def _on_audio_transcript_done(self, event):
+        self._emit('agent_audio_transcript', {'text': event.get("transcript", "")})
 
-    def _accumulate_or_emit_delta(self, b64_chunk: str):
+    def _on_audio_done(self, event):
+        logger.debug("Audio response completed")
+        # Flush any remaining aggregated audio
+        self._flush_audio_accum(force=True)
+        self._emit('response_audio_done', {})
+
+    def _on_response_done(self, event):
+        logger.debug("Full response completed")
+        self._decoder_idle.set()
+        # Safety flush
+        self._flush_audio_accum(force=True)
+        self._emit('response_complete', {})
+
+    def _on_response_created(self, event):
+        logger.debug("Response generation started")
+        self._awaiting_created = False
+        self._decoder_idle.clear()
+        self._emit('response_started', {})
+
+    def _on_speech_started(self, event):
+        self._speech_open = True
+        self._emit('speech_started', {})
+
+    def _on_speech_stopped(self, event):
+        self._speech_open = False
+        self._queue_utterance()
+        self._emit('speech_stopped', {})
+
+    def _on_error(self, event):
+        error = event.get("error", {})
+        if self._awaiting_created and error.get("event_id") == RESPONSE_CREATE_EVENT_ID:
+            # Our response.create was rejected; don't leave the gate closed
+            self._awaiting_created = False
+            self._decoder_idle.set()
+        self._emit('api_error', {'error': error})
+
+    def _emit_audio(self, pcm: bytes):
+        """Emit an audio_chunk event carrying raw PCM16 from a pre-encoded Socket.IO packet.
+
+        Equivalent to self._emit('audio_chunk', pcm) but skips packet construction
+        and JSON encoding; the browser receives the payload as an ArrayBuffer.
+        """
+        if self._eio_sid is None:
+            self._eio_sid = socketio.server.manager.eio_sid_from_sid(self.session_id, '/')
+            if self._eio_sid is None:
+                self._emit('audio_chunk', pcm)
+                return
+        socketio.server.eio.send(self._eio_sid, _AUDIO_CHUNK_HEADER)
+        socketio.server.eio.send(self._eio_sid, pcm)
+
+    def _accumulate_or_emit_delta(self, pcm: bytes):
         """Aggregate small audio delta chunks into larger packets to reduce client-side gaps.
 
         Strategy:
@@ -223,15 +424,7 @@ class WebVoiceLiveSession:
           - If first chunk is small and no follow-up within AGG_MAX_WAIT_MS, flush early (low-latency bias).
           - On large single chunk, emit immediately.
         """
-        # Decode length (avoid keeping decoded data until flush for memory efficiency)
-        try:
-            decoded = base64.b64decode(b64_chunk)
-        except Exception:
-            # If decode fails, emit original to avoid loss
-            socketio.emit('audio_chunk', {'audio': b64_chunk}, room=self.session_id)
-            return
-
-        decoded_len = len(decoded)
+        decoded_len = len(pcm)
         # Heuristic: if chunk already large enough (~>90ms), emit directly to reduce latency
         bytes_per_ms = (self._assumed_sample_rate * 2) / 1000  # 2 bytes per sample
         est_ms = decoded_len / bytes_per_ms
@@ -239,11 +432,11 @@ class WebVoiceLiveSession:
 
         if est_ms >= self.AGG_TARGET_MS * 0.75 and not self._audio_delta_accum:
             # Emit directly
-            socketio.emit('audio_chunk', {'audio': b64_chunk}, room=self.session_id)
+            self._emit_audio(pcm)
             return
 
         # Accumulate
-        self._audio_delta_accum.append(b64_chunk)
+        self._audio_delta_accum.append(pcm)
         self._audio_accum_bytes += decoded_len
         if self._audio_first_delta_time is None:
             self._audio_first_delta_time = now
@@ -262,63 +455,144 @@ class WebVoiceLiveSession:
             # Single small chunk; if not forcing and not meeting criteria, let accumulate
             return
         try:
-            raw = b''.join(base64.b64decode(c) for c in self._audio_delta_accum)
-            merged_b64 = base64.b64encode(raw).decode('ascii')
-            socketio.emit('audio_chunk', {'audio': merged_b64}, room=self.session_id)
-        except Exception as e:
-            print(f"Failed merging audio deltas: {e}. Emitting individually.")
-            for c in self._audio_delta_accum:
-                socketio.emit('audio_chunk', {'audio': c}, room=self.session_id)
+            self._emit_audio(b''.join(self._audio_delta_accum))
         finally:
             self._audio_delta_accum.clear()
             self._audio_accum_bytes = 0
             self._audio_first_delta_time = None
     
-    def send_audio(self, audio_data: str):
-        """Send audio data to Voice Live API"""
+    def send_audio(self, audio_data: bytes):
+        """Queue raw PCM16 audio for the uplink task (callable from any thread)"""
         if self.connection and self.is_active:
+            _AZURE_LOOP.call_soon_threadsafe(self._enqueue_audio, audio_data)
+
+    def _enqueue_audio(self, audio_data):
+        """Put a frame (or None / _UPLINK_COMMIT marker) on the uplink queue, dropping the oldest entry when full"""
+        try:
+            self._uplink_q.put_nowait(audio_data)
+        except asyncio.QueueFull:
+            self._uplink_q.get_nowait()
+            self._uplink_q.put_nowait(audio_data)
+
+    async def _uplink_loop(self):
+        """Forward queued client audio to Voice Live API (base64-encoded once at the Azure boundary)
+
+        Frames that piled up while the previous send was in flight are merged
+        into a single input_audio_buffer.append (up to UPLINK_MAX_BATCH frames).
+        A _UPLINK_COMMIT marker is handled in queue order, after the audio ahead of it.
+        """
+        while self.is_active and self.connection:
+            first = await self._uplink_q.get()
+            if first is None:
+                # Session stopped
+                break
+            if first is _UPLINK_COMMIT:
+                await self._commit_utterance()
+                continue
+            batch = [first]
+            marker = False
+            while len(batch) < UPLINK_MAX_BATCH and not self._uplink_q.empty():
+                frame = self._uplink_q.get_nowait()
+                if frame is None or frame is _UPLINK_COMMIT:
+                    marker = frame
+                    break
+                batch.append(frame)
+            audio_data = batch[0] if len(batch) == 1 else b''.join(batch)
             try:
-                print(f"Sending audio data, length: {len(audio_data)}")
-                param = {
-                    "type": "input_audio_buffer.append", 
-                    "audio": audio_data, 
-                    "event_id": ""
-                }
-                self.connection.send(json.dumps(param))
-                print("Audio data sent successfully")
+                logger.debug("Sending audio data, length: %d", len(audio_data))
+                await self.connection.send(b''.join((_APPEND_PREFIX, base64.b64encode(audio_data), _APPEND_SUFFIX)))
             except Exception as e:
-                print(f"Error sending audio: {e}")
+                logger.error("Error sending audio: %s", e)
+            if marker is None:
+                break
+            if marker is _UPLINK_COMMIT:
+                await self._commit_utterance()
+
+    async def _commit_utterance(self):
+        """Commit the uncommitted input buffer, then queue its response boundary"""
+        try:
+            await self.connection.send(_INPUT_AUDIO_COMMIT_BYTES)
+        except Exception as e:
+            logger.error("Error committing audio buffer: %s", e)
+        self._queue_utterance()
     
     def trigger_response(self):
-        """Trigger a response from the AI agent"""
-        if self.connection and self.is_active and not self.response_in_progress:
+        """Trigger a response from the AI agent once the current one (if any) is done"""
+        if self.connection and self.is_active:
+            _AZURE_LOOP.call_soon_threadsafe(self._on_client_trigger)
+        else:
+            logger.debug("Cannot trigger response - connection not ready")
+
+    def _on_client_trigger(self):
+        # Server VAD already queued a boundary at speech_stopped; only an
+        # utterance cut off mid-speech (mic stopped) needs one from the client.
+        # Its audio is still uncommitted, so the uplink commits it behind the
+        # last queued frames and only then queues the boundary.
+        if self._speech_open:
+            self._speech_open = False
+            self._enqueue_audio(_UPLINK_COMMIT)
+        else:
+            logger.debug("Skipping response trigger - utterance already queued")
+
+    def _queue_utterance(self):
+        self._utterance_q.append(time.monotonic())
+        self._utterance_pending.set()
+
+    async def _response_gate(self):
+        """Send one response.create for all queued utterances whenever the agent is idle
+
+        Every pending turn is already in the conversation by then, so a single
+        response covers them; one response.create per boundary would make the
+        agent answer again with no new input.
+        """
+        while self.is_active:
+            await self._decoder_idle.wait()
+            await self._utterance_pending.wait()
+            if not self.is_active:
+                break
+            if not self._decoder_idle.is_set():
+                # A response started while we waited for the next utterance
+                continue
+            self._utterance_pending.clear()
+            if not self._utterance_q:
+                continue
+            # Oldest boundary, for the latency log; the rest are served by the same response
+            queued_at = self._utterance_q[0]
+            pending = len(self._utterance_q)
+            self._utterance_q.clear()
+            self._decoder_idle.clear()
+            self._awaiting_created = True
             try:
-                print("Triggering response generation")
-                param = {
-                    "type": "response.create",
-                    "response": {
-                        "modalities": ["text", "audio"],
-                        "instructions": "Please respond to the user's input."
-                    }
-                }
-                self.connection.send(json.dumps(param))
-                print("Response trigger sent successfully")
+                logger.debug("Triggering response generation for %d utterance(s) (oldest queued %.0f ms ago)",
+                             pending, (time.monotonic() - queued_at) * 1000)
+                await self.connection.send(_RESPONSE_CREATE_BYTES)
             except Exception as e:
-                print(f"Error triggering response: {e}")
-        elif self.response_in_progress:
-            print("Skipping response trigger - response already in progress")
-        else:
-            print("Cannot trigger response - connection not ready")
+                logger.error("Error triggering response: %s", e)
+                self._awaiting_created = False
+                self._decoder_idle.set()
     
     def stop_session(self):
         """Stop the Voice Live session"""
+        # Stop accepting client audio right away; the rest happens on the loop.
+        # Flag the stop first so the listener's is_active exit isn't taken for
+        # a remote close.
+        self._stop_requested = True
         self.is_active = False
-        self.response_in_progress = False
-        if self.connection:
-            self.connection.close()
-        if self.audio_player:
-            self.audio_player.terminate()
+        _AZURE_LOOP.call_soon_threadsafe(self._shutdown)
     
+    def _shutdown(self):
+        """Tear down on the Azure loop, so it cannot interleave with _run_session"""
+        self._stopped = True
+        self.is_active = False
+        # Wake the uplink and response gate tasks so they can exit, then close the Azure socket
+        self._enqueue_audio(None)
+        self._decoder_idle.set()
+        self._utterance_pending.set()
+        if self.connection:
+            close_task = _AZURE_LOOP.create_task(self.connection.close())
+            close_task.add_done_callback(_log_task_exception)
+            self._tasks.append(close_task)
+
     def pause_session(self):
         """Pause the session without triggering responses"""
         print(f"Pausing session {self.session_id}")
@@ -334,7 +608,11 @@ class WebVoiceLiveSession:
 @app.route('/')
 def index():
     """Serve the main web page"""
-    return render_template('voice_live_web.html')
+    return render_template(
+        'voice_live_web.html',
+        speech_hangover_ms=SPEECH_HANGOVER_MS,
+        speech_prefix_ms=VAD_PREFIX_PADDING_MS,
+    )
 
 @socketio.on('connect')
 def handle_connect():
@@ -347,51 +625,53 @@ def handle_disconnect():
     """Handle client disconnection"""
     session_id = request.sid
     print(f"Client disconnected: {session_id}")
-    if session_id in active_connections:
-        active_connections[session_id].stop_session()
-        del active_connections[session_id]
+    _remove_session(session_id)
 
 @socketio.on('start_voice_session')
 def handle_start_session():
     """Start a new Voice Live session"""
     session_id = request.sid
-    if session_id not in active_connections:
+    with _conn_lock:
+        if session_id in active_connections:
+            return
         voice_session = WebVoiceLiveSession(session_id)
         active_connections[session_id] = voice_session
-        voice_session.start_session()
+    voice_session.start_session()
 
 @socketio.on('audio_data')
 def handle_audio_data(data):
-    """Handle incoming audio data from client"""
+    """Handle incoming audio data from client (raw PCM16 bytes sent as a binary frame)"""
     session_id = request.sid
-    print(f"Received audio data from session {session_id}")
-    if session_id in active_connections:
-        audio_data = data.get('audio')
+    voice_session = active_connections.get(session_id)
+    if voice_session:
+        audio_data = data if isinstance(data, (bytes, bytearray)) else None
         if audio_data:
-            print(f"Audio data length: {len(audio_data)}")
-            active_connections[session_id].send_audio(audio_data)
+            logger.debug("Audio data from session %s, length: %d", session_id, len(audio_data))
+            voice_session.send_audio(audio_data)
         else:
-            print("No audio data in received message")
+            logger.debug("No audio data in received message")
     else:
-        print(f"No active connection found for session {session_id}")
+        logger.debug("No active connection found for session %s", session_id)
 
 @socketio.on('trigger_response')
 def handle_trigger_response():
     """Trigger AI agent response"""
     session_id = request.sid
-    print(f"Triggering response for session {session_id}")
-    if session_id in active_connections:
-        active_connections[session_id].trigger_response()
+    logger.debug("Triggering response for session %s", session_id)
+    voice_session = active_connections.get(session_id)
+    if voice_session:
+        voice_session.trigger_response()
     else:
-        print(f"No active connection found for session {session_id}")
+        logger.debug("No active connection found for session %s", session_id)
 
 @socketio.on('pause_session')
 def handle_pause_session():
     """Pause the session"""
     session_id = request.sid
     print(f"Pausing session {session_id}")
-    if session_id in active_connections:
-        active_connections[session_id].pause_session()
+    voice_session = active_connections.get(session_id)
+    if voice_session:
+        voice_session.pause_session()
         emit('session_paused', {'status': 'success'})
 
 @socketio.on('resume_session')
@@ -399,26 +679,30 @@ def handle_resume_session():
     """Resume the session"""
     session_id = request.sid
     print(f"Resuming session {session_id}")
-    if session_id in active_connections:
-        active_connections[session_id].resume_session()
+    voice_session = active_connections.get(session_id)
+    if voice_session:
+        voice_session.resume_session()
         emit('session_resumed', {'status': 'success'})
 
 @socketio.on('stop_voice_session')
 def handle_stop_session():
     """Stop the Voice Live session"""
-    session_id = request.sid
-    if session_id in active_connections:
-        active_connections[session_id].stop_session()
-        del active_connections[session_id]
+    if _remove_session(request.sid):
         emit('session_stopped', {'status': 'success'})
 
 def check_dependencies():
     """Check if all required dependencies are available"""
     missing_deps = []
     
-    # Check websocket-client
-    if ws_client is None:
-        missing_deps.append("websocket-client")
+    # Check aiohttp (Azure WebSocket client)
+    try:
+        import aiohttp
+    except ImportError:
+        missing_deps.append("aiohttp")
+    
+    # Check orjson (Voice Live event parsing)
+    if orjson is None:
+        missing_deps.append("orjson")
     
     # Check Azure libraries
     try:
@@ -433,18 +717,16 @@ def check_dependencies():
     except ImportError:
         missing_deps.append("flask or flask-socketio")
     
-    # Check voice_live_web module
-    try:
-        from voice_live_web import AzureVoiceLive, VoiceLiveConnection, AudioPlayerAsync
-    except ImportError:
-        missing_deps.append("voice_live_web module (check if voice_live_web.py exists)")
+    # Check voice_live_client module
+    if AzureVoiceLive is None:
+        missing_deps.append("voice_live_client module (check if voice_live_client.py exists)")
     
     if missing_deps:
         print("ERROR: Missing dependencies:")
         for dep in missing_deps:
             print(f"  - {dep}")
         print("\nPlease install missing packages using:")
-        print("  pip install websocket-client azure-identity flask flask-socketio")
+        print("  pip install aiohttp orjson azure-identity flask flask-socketio")
         return False
     
     return True